@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark PSP page decoding: stdlib json vs the configured backend, with and without projection.
+
+Usage: python benchmarks/bench_decode.py [--pages N]
+Pages are synthetic but sized like the real APIs (records per page, nesting, unmapped fields).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import PROJECT_PSP_PAGES
+from providers import decode
+from payment_providers import load_psp_class
+
+# psp -> (records per page, key holding the records, None for a bare list)
+PAGE_SHAPES = {
+    'astropay': (2000, 'data'),
+    'nicheclear': (1000, 'result'),
+    'revolut': (1000, None),
+    'pensopay': (250, 'data'),
+    'januar': (1000, 'data'),
+}
+NOISE_FIELDS = 25
+MIB = 1024 * 1024
+
+def _record(fields: List[str], i: int) -> Dict[str, Any]:
+    rec = {f"extra_{n}": f"value-{i}-{n}" for n in range(NOISE_FIELDS)}
+    rec["customer"] = {"email": f"user{i}@example.com", "address": {"country": "DK", "city": "Copenhagen"}}
+    for f in fields:
+        rec[f] = random.choice([f"{i:08d}", 12.5 + i, "2026-01-01T00:00:00+0000"])
+    return rec
+
+def make_page(psp: str):
+    size, key = PAGE_SHAPES[psp]
+    client = load_psp_class(psp)({})
+    records = [_record(list(client.projection_fields), i) for i in range(size)]
+    body = records if key is None else {key: records, "hasMore": False}
+    return json.dumps(body).encode(), client
+
+def measure(fn: Callable[[], Any], pages: int):
+    """ms per page (untraced), transient peak MiB while decoding one page, MiB still held afterwards."""
+    t0 = time.perf_counter()
+    for _ in range(pages):
+        fn()
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    kept = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed / pages * 1000, (peak - start) / MIB, (current - start) / MIB
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=5)
+    args = parser.parse_args()
+
+    backends = {'json': json.loads}
+    try:
+        import orjson
+        backends['orjson'] = orjson.loads
+    except ImportError:
+        pass
+
+    print(f"configured backend: {decode.BACKEND}, projection: {PROJECT_PSP_PAGES}, pages per run: {args.pages}")
+    print(f"{'psp':<12}{'mode':<27}{'ms/page':>10}{'peak MiB':>10}{'held MiB':>10}")
+    for psp, (_, key) in PAGE_SHAPES.items():
+        content, client = make_page(psp)
+        records = (lambda d: d if key is None else d[key])
+        fields = client.projection_fields
+        modes = {}
+        for name, loads in backends.items():
+            modes[f'{name} (full)'] = lambda loads=loads: records(loads(content))
+            modes[f'{name} + projection'] = lambda loads=loads: decode.project(records(loads(content)), fields)
+        modes['json streaming projection'] = lambda: records(decode.stream_projected(content, key, fields))
+        for mode, fn in modes.items():
+            ms, peak, held = measure(fn, args.pages)
+            print(f"{psp:<12}{mode:<27}{ms:>10.2f}{peak:>10.2f}{held:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""Profile the monitoring pipeline stage by stage and fail when a stage goes over budget.
+
+Runs the real main.main -> monitor_deltas pipeline with its I/O backed by fixtures: each PSP
+client's fetch_payments decodes its fixture through the client's own _decode_page/_in_window,
+read_from_db streams the orders fixture through a fake COPY cursor, Redis is an in-memory fake
+and the Slack webhook is a no-op. Stages (per-PSP fetch, standardize, read_from_db, resolve,
+incremental, join, dedup, alert) are measured by wrapping the production functions.
+PSPs are fetched one at a time so time and memory can be attributed to each.
+
+The pipeline runs --runs times (default 2) against the same fixtures, so the second run
+exercises the incremental settled-payment skip and the seen-id dedup; results are keyed
+run<N>/<stage>. tracemalloc slows Python code several times over, so like bench_decode.py the
+runs are done twice from a fresh Redis: an untraced pass for wall and CPU time, then a traced
+pass for the tracemalloc peak above the memory held when each stage started.
+
+Usage:
+  python benchmarks/profile_pipeline.py                       # synthetic fixtures
+  python benchmarks/profile_pipeline.py --fixtures DIR        # replay recorded fixtures
+  python benchmarks/profile_pipeline.py --record DIR          # record fixtures from live PSPs and DB
+  python benchmarks/profile_pipeline.py --save-baseline       # store this run as the baseline
+
+Exits 1 when a stage exceeds its budget (pipeline_budgets.json) or regresses past the
+stored baseline (pipeline_baseline.json) by more than --tolerance.
+"""
+import argparse
+import cProfile
+import fnmatch
+import functools
+import json
+import os
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pandas as pd
+from config import PSP_CLIENTS, PSP_FIELD_MAPPINGS, HOURS_BACK_SEARCH
+import circuit_breaker
+import database_orders
+import filter_duplicates
+import main as pipeline
+import monitor
+import payment_providers
+import post_to_slack
+import reconcile_state
+from payment_providers import PaymentMonitor, load_psp_class
+from monitor import REFERENCE_MATCHED_PSPS
+
+BUDGETS_PATH = os.path.join(BENCH_DIR, "pipeline_budgets.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "pipeline_baseline.json")
+MIB = 1024 * 1024
+
+results: Dict[str, Dict[str, float]] = {}
+_run = {"name": "run1", "traced": False, "profile": False, "active": False}
+
+@contextmanager
+def stage(name: str):
+    """Record wall and CPU time (untraced pass) or tracemalloc peak above entry in MiB (traced pass).
+
+    Repeated entries in a run add up their times and keep the highest peak; a stage entered
+    while another is active counts towards the outer one.
+    """
+    if _run["active"]:
+        yield
+        return
+    _run["active"] = True
+    traced = _run["traced"]
+    # cProfile runs in the traced pass too, so the timings stay free of its overhead
+    profiler = cProfile.Profile() if traced and _run["profile"] else None
+    if traced:
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        seconds, cpu_seconds = time.perf_counter() - wall, time.process_time() - cpu
+        _run["active"] = False
+        r = results.setdefault(f"{_run['name']}/{name}", {"seconds": 0.0, "cpu_seconds": 0.0, "peak_mib": 0.0})
+        if traced:
+            _, peak = tracemalloc.get_traced_memory()
+            r["peak_mib"] = max(r["peak_mib"], (peak - start_current) / MIB)
+        else:
+            r["seconds"] += seconds
+            r["cpu_seconds"] += cpu_seconds
+        if profiler:
+            print(f"--- {_run['name']}/{name} ---")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(10)
+
+def timed(name: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+class FakeRedis:
+    """In-memory stand-in for the Redis calls made by main, reconcile_state, circuit_breaker and filter_duplicates."""
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+
+    def setnx(self, key, value):
+        if key in self.data:
+            return False
+        self.data[key] = str(value)
+        return True
+
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+        return True
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hincrby(self, key, field, amount=1):
+        h = self.data.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+        return int(h[field])
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = str(value)
+
+    def sadd(self, key, *values):
+        self.data.setdefault(key, set()).update(str(v) for v in values)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def scan_iter(self, pattern):
+        return [k for k in list(self.data) if fnmatch.fnmatch(k, pattern)]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+class FixtureCursor:
+    """Answers read_from_db's COPY with the orders fixture, written in 64 KiB chunks like a socket would."""
+
+    def __init__(self, csv: bytes):
+        self.csv = csv
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, query, params):
+        return query.encode()
+
+    def copy_expert(self, sql, file):
+        for i in range(0, len(self.csv), 65536):
+            file.write(self.csv[i:i + 65536])
+
+class FixtureConnection:
+    def __init__(self, csv: bytes):
+        self.csv = csv
+
+    def cursor(self):
+        return FixtureCursor(self.csv)
+
+    def close(self):
+        pass
+
+def make_synthetic(path: str, n_orders: int, per_psp: int, mismatch_rate: float, seed: int = 0):
+    """Write fixtures shaped like fetch_payments output for every PSP plus a matching orders table."""
+    rng = random.Random(seed)
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(hours=HOURS_BACK_SEARCH)
+    span = (end - start).total_seconds()
+    os.makedirs(path, exist_ok=True)
+
+    orders = pd.DataFrame({
+        "order_id": [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(n_orders)],
+        "order_total": [round(rng.uniform(5, 500), 2) for _ in range(n_orders)],
+        "order_currency": "EUR",
+        "payment_reference": None,
+        "created_at": [(start + timedelta(seconds=rng.uniform(0, span))).isoformat() + "+00:00"
+                       for _ in range(n_orders)],
+    })
+    orders.to_csv(os.path.join(path, "orders.csv"), index=False)
+
+    picks = iter(rng.sample(range(n_orders), min(n_orders, per_psp * len(PSP_CLIENTS))))
+    for name in PSP_CLIENTS:
+        mapping = PSP_FIELD_MAPPINGS[name]
+        records = []
+        for i in range(per_psp):
+            idx = next(picks, None)
+            order = orders.iloc[idx] if idx is not None else None
+            order_id = order.order_id if order is not None else str(uuid.uuid4())  # orphan
+            amount = order.order_total if order is not None else 10.0
+            if rng.random() < mismatch_rate:
+                amount += 1
+            rec = {
+                mapping.order_id: order_id,
+                mapping.payment_reference: f"Swapped {order_id.upper()} thanks" if name in REFERENCE_MATCHED_PSPS else None,
+                mapping.created_date: (start + timedelta(seconds=rng.uniform(0, span))).isoformat(),
+                mapping.amount: amount,
+                mapping.currency: "EUR",
+                mapping.status: "COMPLETED",
+                mapping.transaction_id: f"{name}-{i}",
+            }
+            rec.pop(None, None)
+            records.append(rec)
+        with open(os.path.join(path, f"{name}.json"), "w") as f:
+            json.dump(records, f)
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"start": start.isoformat(), "end": end.isoformat()}, f)
+
+def record_fixtures(path: str, hours_back: int):
+    """Capture fetch_payments output from the configured PSPs and the orders window."""
+    os.makedirs(path, exist_ok=True)
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(hours=hours_back)
+    for name, psp in PaymentMonitor().psps.items():
+        payments = psp.fetch_payments(start.isoformat(), end.isoformat())
+        # NaN is not valid JSON for every decode backend
+        payments = [{k: None if isinstance(v, float) and v != v else v for k, v in p.items()} for p in payments]
+        with open(os.path.join(path, f"{name}.json"), "w") as f:
+            json.dump(payments, f, default=str)
+        print(f"Recorded {len(payments)} {name} payments")
+    database_orders.read_from_db(hours_back=hours_back).to_csv(os.path.join(path, "orders.csv"), index=False)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"start": start.isoformat(), "end": end.isoformat()}, f)
+
+
+def load_fixtures(path: str):
+    """Read fixtures and shift their timestamps so the recording window ends now (untimed)."""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    shift = pd.Timestamp.now(tz="UTC") - pd.Timestamp(meta["end"], tz="UTC")
+
+    orders = pd.read_csv(os.path.join(path, "orders.csv"))
+    orders["created_at"] = pd.to_datetime(orders["created_at"], utc=True) + shift
+    orders_csv = orders.to_csv(index=False).encode()
+
+    payments: Dict[str, bytes] = {}
+    for name in PSP_CLIENTS:
+        fixture = os.path.join(path, f"{name}.json")
+        if not os.path.exists(fixture):
+            continue
+        field = PSP_FIELD_MAPPINGS[name].created_date
+        with open(fixture) as f:
+            records = json.load(f)
+        created = pd.to_datetime(pd.Series([r.get(field) for r in records], dtype=object), utc=True) + shift
+        for record, ts in zip(records, created):
+            record[field] = ts.isoformat()
+        payments[name] = json.dumps(records, default=str).encode()
+    return payments, orders_csv
+
+def replay_monitor(payments: Dict[str, bytes]):
+    """PaymentMonitor whose clients replay fixtures through their own decode and window code."""
+
+    def replay_fetch(psp, content: bytes):
+        def fetch_payments(start_date: str, end_date: str) -> List[dict]:
+            return psp._in_window(psp._decode_page(content, None), start_date, end_date)
+        return fetch_payments
+
+    class ReplayMonitor(PaymentMonitor):
+        def _init_psps(self):
+            for name, content in payments.items():
+                psp = load_psp_class(name)({})
+                psp.fetch_payments = timed(f"fetch:{name}", replay_fetch(psp, content))
+                psp.standardize_payments = timed("standardize", psp.standardize_payments)
+                self.psps[name] = psp
+
+        async def _fetch_all(self, start_str: str, end_str: str) -> List[dict]:
+            # One PSP at a time so time and memory are attributable per PSP
+            all_payments = []
+            for name, psp in self.psps.items():
+                all_payments.extend(await self._fetch_psp(name, psp, start_str, end_str))
+            return all_payments
+
+    return ReplayMonitor
+
+def fresh_redis():
+    """Give every module that talks to Redis the same new, empty FakeRedis."""
+    redis = FakeRedis()
+    pipeline.get_redis = lambda: redis
+    for module in (reconcile_state, circuit_breaker, filter_duplicates):
+        module.r = redis
+
+def install(payments: Dict[str, bytes], orders_csv: bytes) -> list:
+    """Point the production modules at the fixtures and wrap each stage; returns the reports."""
+    database_orders.engine.raw_connection = lambda: FixtureConnection(orders_csv)
+    post_to_slack.post_slack_webhook = lambda *args, **kwargs: True
+
+    monitor.PaymentMonitor = replay_monitor(payments)
+    payment_providers.payments_frame = timed("standardize", payment_providers.payments_frame)
+    monitor.read_from_db = timed("read_from_db", monitor.read_from_db)
+    monitor.resolve_references = timed("resolve", monitor.resolve_references)
+    for name in ("with_order_fields", "load_settled", "save_states"):
+        setattr(monitor, name, timed("incremental", getattr(monitor, name)))
+    monitor.diff_deltas = timed("join", monitor.diff_deltas)
+    for name in ("load_seen_order_ids", "filter_new_mismatches", "save_seen_order_ids"):
+        setattr(pipeline, name, timed("dedup", getattr(pipeline, name)))
+    pipeline.alert_slack = timed("alert", pipeline.alert_slack)
+
+    reports = []
+    monitor_deltas = pipeline.monitor_deltas
+
+    def capture(*args, **kwargs):
+        reports.append(monitor_deltas(*args, **kwargs))
+        return reports[-1]
+    pipeline.monitor_deltas = capture
+    return reports
+
+def check(budgets: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Return one line per stage metric over its budget or over baseline * (1 + tolerance)."""
+    failures = []
+    for name, measured in results.items():
+        for pattern, limits in budgets.items():
+            if fnmatch.fnmatch(name, pattern):
+                for metric, limit in limits.items():
+                    if measured[metric] > limit:
+                        failures.append(f"{name}: {metric} {measured[metric]:.3f} over budget {limit:.3f}")
+        for metric, base in baseline.get(name, {}).items():
+            if metric == "cpu_seconds":
+                continue  # tracked, but too noisy on a shared host to gate on
+            if measured[metric] > base * (1 + tolerance):
+                failures.append(f"{name}: {metric} {measured[metric]:.3f} regressed from baseline {base:.3f}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fixtures', help="directory of recorded fixtures to replay")
+    parser.add_argument('--record', metavar='DIR', help="record fixtures from live PSPs and the DB, then exit")
+    parser.add_argument('--orders', type=int, default=20_000)
+    parser.add_argument('--payments-per-psp', type=int, default=2_000)
+    parser.add_argument('--mismatch-rate', type=float, default=0.01)
+    parser.add_argument('--runs', type=int, default=2, help="pipeline runs against the same fixtures")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed regression over baseline (0.5 = +50%%)")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--cprofile', action='store_true', help="print the top functions of each stage")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, HOURS_BACK_SEARCH)
+        return
+
+    path = args.fixtures or os.path.join(BENCH_DIR, ".synthetic_fixtures")
+    if not args.fixtures:
+        make_synthetic(path, args.orders, args.payments_per_psp, args.mismatch_rate)
+
+    payments, orders_csv = load_fixtures(path)
+    reports = install(payments, orders_csv)
+    _run["profile"] = args.cprofile
+
+    for traced in (False, True):
+        _run["traced"] = traced
+        fresh_redis()
+        if traced:
+            tracemalloc.start()
+        for run in range(1, args.runs + 1):
+            _run["name"] = f"run{run}"
+            pipeline.main()
+            report = reports[-1]
+            if not traced:
+                print(f"run{run}: {len(report.mismatches)} mismatches, {len(report.orphan_payments)} orphans, "
+                      f"{len(report.missing_payments)} missing, degraded: {report.degraded_psps or 'none'}")
+        if traced:
+            tracemalloc.stop()
+
+    print(f"{'stage':<26}{'seconds':>10}{'cpu':>10}{'peak MiB':>10}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['seconds']:>10.3f}{r['cpu_seconds']:>10.3f}{r['peak_mib']:>10.2f}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return
+
+    with open(BUDGETS_PATH) as f:
+        budgets = json.load(f)
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    else:
+        print("No baseline stored, checking budgets only")
+
+    failures = check(budgets, baseline, args.tolerance)
+    for line in failures:
+        print(f"FAIL {line}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
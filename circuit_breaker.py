@@ -0,0 +1,31 @@
+import time
+from redis_client import get_redis
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS
+
+r = get_redis()
+
+KEY_PREFIX = "psp_breaker"
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+def _key(psp: str) -> str:
+    return f"{KEY_PREFIX}:{psp}"
+
+def breaker_state(psp: str) -> str:
+    """closed: fetch normally; open: skip the PSP; half_open: cooldown over, let one probe through."""
+    data = r.hgetall(_key(psp))
+    if int(data.get("failures", 0)) < BREAKER_FAILURE_THRESHOLD:
+        return CLOSED
+    if time.time() - float(data.get("opened_at", 0)) < BREAKER_COOLDOWN_SECONDS:
+        return OPEN
+    return HALF_OPEN
+
+def record_success(psp: str):
+    r.delete(_key(psp))
+
+def record_failure(psp: str):
+    """Count a failed fetch; (re)open the circuit once the threshold is reached, including a failed probe."""
+    key = _key(psp)
+    failures = r.hincrby(key, "failures", 1)
+    if failures >= BREAKER_FAILURE_THRESHOLD:
+        r.hset(key, "opened_at", time.time())
+    r.expire(key, 7*86400)
@@ -2,7 +2,15 @@ from dataclasses import dataclass
 import os
 
 HOURS_BACK_SEARCH = 2
+MISSING_PAYMENT_GRACE_MINUTES = 30  # orders younger than this may still be in-flight at the PSP
+ORDER_LOOKBACK_MARGIN_HOURS = 24  # extra order history so payments for orders created before the window still match
+REQUEST_TIMEOUT = 30  # seconds per PSP HTTP request
+BREAKER_FAILURE_THRESHOLD = 3  # consecutive failed runs before a PSP's circuit opens
+BREAKER_COOLDOWN_SECONDS = 900  # how long an open circuit skips the PSP before a half-open probe
+INCREMENTAL_RECONCILIATION = True  # skip payments settled as matched in a previous run (state in Redis)
 NO_DECIMAL_CURRENCIES = ["jpy", "vnd", "clp"]
+JSON_BACKEND = os.getenv('PSP_JSON_BACKEND', 'auto')  # auto: orjson if installed, else json; stream: lowest memory, more CPU than json
+PROJECT_PSP_PAGES = True  # drop raw PSP fields that are neither mapped nor used by the client while decoding
 
 # Config
 PSP_CONFIGS = {
@@ -16,6 +24,18 @@ PSP_CONFIGS = {
     'januar': {"api_key": os.getenv("JANUAR_API_KEY"), 'api_secret': os.getenv("JANUAR_API_SECRET"), "account_id": os.getenv("JANUAR_ACCOUNT_ID")}
 }
 
+# PSP client plugins as "module:Class"; only imported for PSPs with credentials in PSP_CONFIGS
+PSP_CLIENTS = {
+    'astropay': 'providers.astropay:AstroPayPSP',
+    'stripe': 'providers.stripe:StripePSP',
+    'skrill': 'providers.skrill:SkrillPSP',
+    'nicheclear': 'providers.nicheclear:NicheclearPSP',
+    'pensopay': 'providers.pensopay:PensoPayPSP',
+    'paypal': 'providers.paypal:PayPalPSP',
+    'revolut': 'providers.revolut:RevolutPSP',
+    'januar': 'providers.januar:JanuarPSP',
+}
+
 @dataclass
 class FieldMapping:
     """PSP-specific field mappings - single field name per PSP."""
@@ -27,7 +47,7 @@ class FieldMapping:
     transaction_id: str
     payment_reference: str
 
-# ADD NEW PSP's HERE
+# ADD NEW PSP's HERE (and register the client in PSP_CLIENTS)
 PSP_FIELD_MAPPINGS = {
     'astropay': FieldMapping(
         order_id='reference',
@@ -1,33 +1,96 @@
+from contextlib import closing, contextmanager
+from typing import BinaryIO, Iterator
+import threading
 from sqlalchemy import create_engine
 import os
 import pandas as pd
 from config import HOURS_BACK_SEARCH
 PORT = 5432
 TABLE_NAME = "production"
+DB_POOL_SIZE = 2  # one job per process, a spare for overlapping reads
+DB_POOL_RECYCLE = 1800
 
-engine = create_engine(f"postgresql://{os.getenv('SWAPPED_DB_USER')}:{os.getenv('SWAPPED_DB_PASS')}@{os.getenv('SWAPPED_DB_HOST')}:{PORT}/{TABLE_NAME}")
+# Reads go to the replica when one is configured
+DB_HOST = os.getenv('SWAPPED_DB_REPLICA_HOST') or os.getenv('SWAPPED_DB_HOST')
+
+engine = create_engine(
+    f"postgresql://{os.getenv('SWAPPED_DB_USER')}:{os.getenv('SWAPPED_DB_PASS')}@{DB_HOST}:{PORT}/{TABLE_NAME}",
+    pool_size=DB_POOL_SIZE,
+    max_overflow=0,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE,
+)
 
 cols = [
     'order_id',
     'order_total',
     'order_currency',
     'payment_reference',
+    'created_at',
 ]
 
-def read_from_db(hours_back: int = HOURS_BACK_SEARCH):
+dtypes = {
+    'order_id': str,
+    'order_total': 'float64',
+    'order_currency': str,
+    'payment_reference': str,
+}
+
+def _query(hours_back: int):
     cols_sql = ", ".join(cols)
-    
+
     end = pd.Timestamp.now(tz='utc')
     start = end - pd.Timedelta(hours=hours_back)
-    
+
     query = f"""
-    SELECT {cols_sql} 
+    SELECT {cols_sql}
     FROM public.orders
     WHERE created_at >= %s
     AND created_at <= %s
     """
-    
-    df = pd.read_sql(query, engine, params=(start, end))
-    df["order_id"] = df["order_id"].astype(str)
-    return df
+    return query, (start.to_pydatetime(), end.to_pydatetime())
+
+@contextmanager
+def _copy_orders(hours_back: int) -> Iterator[BinaryIO]:
+    """Run the orders query as COPY ... TO STDOUT (CSV) and yield the stream as it arrives.
 
+    COPY writes into a pipe from a worker thread while the caller parses the read end, so the
+    CSV is never buffered whole.
+    """
+    query, params = _query(hours_back)
+    read_fd, write_fd = os.pipe()
+    errors = []
+    with closing(engine.raw_connection()) as conn:
+        with conn.cursor() as cur:
+            # COPY takes no bind parameters, so let the driver inline them safely
+            select = cur.mogrify(query, params).decode()
+
+            def copy():
+                try:
+                    with open(write_fd, 'wb') as sink:
+                        cur.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER true)", sink)
+                except Exception as e:  # includes BrokenPipeError when the reader stops early
+                    errors.append(e)
+
+            writer = threading.Thread(target=copy, daemon=True)
+            writer.start()
+            try:
+                with open(read_fd, 'rb') as source:
+                    yield source
+            except Exception:
+                writer.join()
+                if errors and not isinstance(errors[0], BrokenPipeError):
+                    raise errors[0]  # a failed COPY surfaces as truncated CSV on the read side
+                raise
+            finally:
+                writer.join()
+    if errors:
+        raise errors[0]
+
+def read_from_db(hours_back: int = HOURS_BACK_SEARCH) -> pd.DataFrame:
+    """Bulk load orders with COPY ... TO STDOUT, parsed straight into typed columns while streaming."""
+    with _copy_orders(hours_back) as source:
+        # only COPY's empty NULL field is missing; "NA" or "null" in a reference is text
+        df = pd.read_csv(source, dtype=dtypes, parse_dates=['created_at'], keep_default_na=False, na_values=[''])
+    df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+    return df
@@ -1,6 +1,7 @@
 from datetime import datetime
 import json
 import redis
+import pandas as pd
 from redis_client import get_redis
 
 r = get_redis()
@@ -15,3 +16,6 @@ def load_seen_order_ids() -> set:
     for key in r.scan_iter("psp_state:*"):
         all_ids.update(r.smembers(key))
     return all_ids
+
+def filter_new_mismatches(mismatches: pd.DataFrame, seen_order_ids: set) -> pd.DataFrame:
+    return mismatches[~mismatches['order_id'].astype(str).isin(seen_order_ids)]
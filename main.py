@@ -8,7 +8,7 @@ import atexit
 import redis
 from config import HOURS_BACK_SEARCH
 from post_to_slack import alert_slack
-from filter_duplicates import load_seen_order_ids, save_seen_order_ids
+from filter_duplicates import load_seen_order_ids, save_seen_order_ids, filter_new_mismatches
 from monitor import monitor_deltas
 from redis_client import get_redis
 
@@ -18,6 +18,7 @@ for name in ["urllib3", "requests", "stripe", "httpx"]:
     logging.getLogger(name).setLevel(logging.WARNING)
 
 LOCK_KEY = "psp-order-deltas:job-lock"
+LOG_SAMPLE_SIZE = 10  # order ids shown per orphan/missing warning
 _redis_client = None
 _lock_held = False
 
@@ -48,6 +49,9 @@ def signal_handler(signum, frame):
     release_lock()
     exit(1)
 
+def _sample_ids(df, n: int = LOG_SAMPLE_SIZE) -> list:
+    return df['order_id'].astype(str).head(n).tolist()
+
 def main():
     if not acquire_lock():
         return
@@ -58,11 +62,23 @@ def main():
 
     try:
         logger.info(f"Fetching payments from last {HOURS_BACK_SEARCH} hours")
-        mismatches = monitor_deltas()
+        report = monitor_deltas()
+        mismatches = report.mismatches
+        for psp, reason in report.degraded_psps.items():
+            logger.warning(f"PSP {psp} degraded ({reason}); its payments are missing from this run")
+        if len(report.orphan_payments) > 0:
+            logger.warning(f"{len(report.orphan_payments)} PSP payments without a matching order, e.g. "
+                           f"{_sample_ids(report.orphan_payments)}")
+        if len(report.missing_payments) > 0 and not report.missing_complete:
+            logger.info(f"Not reporting {len(report.missing_payments)} orders without a PSP payment: "
+                        f"incomplete while {', '.join(report.degraded_psps)} degraded")
+        elif len(report.missing_payments) > 0:
+            logger.warning(f"{len(report.missing_payments)} orders not reported by any PSP, e.g. "
+                           f"{_sample_ids(report.missing_payments)}")
         if len(mismatches) > 0:
             # Filter NEW mismatches only
             seen_order_ids = load_seen_order_ids()
-            new_mismatches = mismatches[~mismatches['order_id'].astype(str).isin(seen_order_ids)]
+            new_mismatches = filter_new_mismatches(mismatches, seen_order_ids)
 
             if len(new_mismatches) > 0:
                 logger.info(f"Found {len(new_mismatches)} NEW mismatches (total {len(mismatches)})")
@@ -1,31 +1,148 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 import pandas as pd
 from payment_providers import PaymentMonitor
 from database_orders import read_from_db
-from config import HOURS_BACK_SEARCH
+from config import HOURS_BACK_SEARCH, MISSING_PAYMENT_GRACE_MINUTES, ORDER_LOOKBACK_MARGIN_HOURS, INCREMENTAL_RECONCILIATION
+from reference_resolver import ReferenceIndex
+from reconcile_state import load_settled, save_states, MATCHED, MISMATCHED, PENDING
 import numpy as np
 
-def monitor_deltas(hours_back: int = HOURS_BACK_SEARCH, delta_threshold: float = 0.001) -> pd.DataFrame:
-    """Fetch payments, match orders, detect mismatches."""
+logger = logging.getLogger(__name__)
+
+# PSPs that carry our order id in a free-text reference instead of an order_id field
+REFERENCE_MATCHED_PSPS = ["januar"]
+
+@dataclass
+class DeltaReport:
+    """Result of diffing PSP payments against DB orders."""
+    mismatches: pd.DataFrame        # matched on order_id, amounts differ
+    orphan_payments: pd.DataFrame   # PSP payment with no DB order
+    missing_payments: pd.DataFrame  # DB order created in the window that no PSP reported (past the grace period)
+    degraded_psps: Dict[str, str] = field(default_factory=dict)  # psp -> reason it was skipped or failed
+
+    @property
+    def missing_complete(self) -> bool:
+        """False when a PSP was skipped or failed, so its paid orders also land in missing_payments."""
+        return not self.degraded_psps
+
+def resolve_references(payments: pd.DataFrame, order_ids: pd.Series) -> pd.DataFrame:
+    """Fill order_id of reference-matched payments with the known order id found in payment_reference.
+
+    Unresolved references keep the reference text as order_id so they surface as orphan payments.
+    """
+    todo = payments["psp"].isin(REFERENCE_MATCHED_PSPS) & payments["order_id"].isna()
+    if not todo.any():
+        return payments
+    payments = payments.copy()
+    references = payments.loc[todo, "payment_reference"]
+    resolved = ReferenceIndex(order_ids.astype(str)).resolve_all(references)
+    payments.loc[todo, "order_id"] = resolved.fillna(references)
+    return payments
+
+def match_keys(payments: pd.DataFrame) -> pd.Series:
+    """Order id each payment should join on."""
+    return payments["order_id"].astype(str)
+
+def with_order_fields(payments: pd.DataFrame, orders_db: pd.DataFrame) -> pd.DataFrame:
+    """Payment keys and fingerprint fields, with order_total and order_currency of the order each joins to."""
+    orders = orders_db.drop_duplicates("order_id").set_index("order_id")
+    keys = match_keys(payments)
+    return payments[["psp", "transaction_id", "amount", "status"]].assign(
+        order_total=keys.map(orders["order_total"]),
+        order_currency=keys.map(orders["order_currency"]),
+    )
+
+def drop_settled(payments: pd.DataFrame, orders_db: pd.DataFrame, settled: pd.Series):
+    """Remove settled payments, and the orders they join to unless an unsettled payment still joins there too."""
+    keys = match_keys(payments)
+    done = set(keys[settled]) - set(keys[~settled])
+    return payments[~settled], orders_db[~orders_db["order_id"].astype(str).isin(done)]
+
+def payment_states(payments: pd.DataFrame, report: DeltaReport) -> pd.Series:
+    """Reconciliation state of each payment in a diff run."""
+    def keys(df: pd.DataFrame) -> pd.MultiIndex:
+        return pd.MultiIndex.from_frame(df[["psp", "transaction_id"]])
+
+    states = pd.Series(MATCHED, index=payments.index)
+    states[keys(payments).isin(keys(report.mismatches))] = MISMATCHED
+    states[keys(payments).isin(keys(report.orphan_payments))] = PENDING
+    return states
+
+def diff_deltas(df_payments: pd.DataFrame, orders_db: pd.DataFrame, delta_threshold: float = 0.001,
+                grace_minutes: int = MISSING_PAYMENT_GRACE_MINUTES,
+                now: Optional[pd.Timestamp] = None,
+                window_start: Optional[pd.Timestamp] = None) -> DeltaReport:
+    """Single outer hash join of payments and orders, split into mismatches, orphans and missing.
+
+    orders_db may reach further back than the payments window so late payments still match;
+    only orders created at or after window_start are reported as missing.
+    """
+    now = now if now is not None else pd.Timestamp.now(tz='UTC')
+
+    payments = df_payments.copy()
+    if payments.empty:
+        payments = pd.DataFrame(columns=['psp', 'order_id', 'payment_reference', 'amount'])
+    payments = resolve_references(payments, orders_db["order_id"])
+    payments["match_key"] = match_keys(payments)
+
+    orders = orders_db.rename(columns={"order_id": "match_key"})
+    orders["match_key"] = orders["match_key"].astype(str)
+
+    df_all = payments.drop(columns=["order_id"]).merge(
+        orders, on="match_key", how="outer", suffixes=('', '_db'), indicator=True
+    ).rename(columns={"match_key": "order_id"})
+
+    matched = df_all[df_all["_merge"] == "both"].copy()
+    matched["delta"] = np.abs(matched["order_total"] - matched["amount"])
+    mismatches = matched[
+        (matched.delta >= delta_threshold) &
+        matched.order_total.notna()
+    ]
+    mismatches = mismatches.sort_values(['delta', 'psp']).reset_index(drop=True)
+
+    orphan_payments = df_all[df_all["_merge"] == "left_only"]
+    orphan_payments = orphan_payments[payments.columns.drop("match_key")]
+    orphan_payments = orphan_payments.sort_values(['psp', 'order_id']).reset_index(drop=True)
+
+    missing = df_all[df_all["_merge"] == "right_only"]
+    if "created_at" in missing:
+        missing = missing[missing["created_at"] <= now - pd.Timedelta(minutes=grace_minutes)]
+        if window_start is not None:
+            missing = missing[missing["created_at"] >= window_start]
+    db_cols = {f"{c}_db" if f"{c}_db" in missing else c: c for c in orders_db.columns}
+    missing_payments = missing[list(db_cols)].rename(columns=db_cols)
+    missing_payments = missing_payments.sort_values('order_id').reset_index(drop=True)
+
+    return DeltaReport(
+        mismatches=mismatches.drop(columns=["_merge"]),
+        orphan_payments=orphan_payments,
+        missing_payments=missing_payments,
+    )
+
+def monitor_deltas(hours_back: int = HOURS_BACK_SEARCH, delta_threshold: float = 0.001,
+                   incremental: bool = INCREMENTAL_RECONCILIATION) -> DeltaReport:
+    """Fetch payments, match orders, detect mismatches, orphan payments and missing payments."""
     # Fetch data
     monitor = PaymentMonitor()
+    now = pd.Timestamp.now(tz='UTC')
     df_payments = monitor.fetch_all_payments(hours_back=hours_back)
-    orders_db = read_from_db()
-    
-    df_non_januar = df_payments[df_payments.psp != "januar"].merge(
-        orders_db, on="order_id", how="left", suffixes=('', '_db')
-    )
-    df_januar = df_payments[df_payments.psp == "januar"].merge(
-        orders_db, left_on="payment_reference", right_on="order_id", how="left"
-    )
-    
-    df_all = pd.concat([df_non_januar, df_januar], ignore_index=True)
-    df_all["delta"] = np.abs(df_all["order_total"] - df_all["amount"])
-    
-    mismatches = df_all[
-        (df_all.delta >= delta_threshold) & 
-        df_all.order_total.notna()
-    ].copy()
-    
-    mismatches = mismatches.sort_values(['delta', 'psp']).reset_index(drop=True)
-    
-    return mismatches
\ No newline at end of file
+    orders_db = read_from_db(hours_back=hours_back + ORDER_LOOKBACK_MARGIN_HOURS)
+
+    if not df_payments.empty:
+        df_payments = resolve_references(df_payments, orders_db["order_id"])
+
+    if incremental and not df_payments.empty:
+        fingerprinted = with_order_fields(df_payments, orders_db)
+        settled = load_settled(fingerprinted)
+        df_payments, orders_db = drop_settled(df_payments, orders_db, settled)
+        logger.info(f"Skipping {settled.sum()} payments settled in previous runs")
+
+    report = diff_deltas(df_payments, orders_db, delta_threshold=delta_threshold,
+                         now=now, window_start=now - pd.Timedelta(hours=hours_back))
+
+    if incremental and not df_payments.empty:
+        save_states(fingerprinted.loc[df_payments.index], payment_states(df_payments, report))
+    report.degraded_psps = monitor.degraded
+    return report
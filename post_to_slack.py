@@ -24,7 +24,7 @@ def post_slack_webhook(webhook_url: str, message: str, blocks: list = None) -> b
         logger.error(f"Slack webhook failed: {e}")
         return False
 
-def alert_slack(mismatches: pd.DataFrame):
+def build_alert_blocks(mismatches: pd.DataFrame) -> list:
     blocks = [
         {
             "type": "header",
@@ -41,5 +41,8 @@ def alert_slack(mismatches: pd.DataFrame):
             }
         })
         blocks.append({"type": "divider"})
-    
+    return blocks
+
+def alert_slack(mismatches: pd.DataFrame):
+    blocks = build_alert_blocks(mismatches)
     return post_slack_webhook(os.getenv("SLACK_WEBHOOK_URL"), f"🚨 {len(mismatches)} mismatches", blocks)
@@ -0,0 +1 @@
+"""PSP client plugins. Modules are imported on demand by payment_providers.load_psp_class."""
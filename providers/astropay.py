@@ -0,0 +1,57 @@
+import requests
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from providers.base import PSPBase
+
+class AstroPayPSP(PSPBase):
+    PSP_NAME = 'astropay'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.base_url = "https://merchant-api.astropay.com"
+    
+    def _format_datetime(self, date_str: str) -> str:
+        """Convert YYYY-MM-DD to YYYY-MM-DDTHH:MM:SS."""
+        dt = datetime.fromisoformat(date_str)
+        return dt.strftime('%Y-%m-%dT%H:%M:%S')
+    
+    def _fetch_page(self, created_from: str, created_to: str, page: int = 1, 
+                   size: int = 2000, status: Optional[str] = None, 
+                   country: Optional[str] = None) -> Dict[str, Any]:
+        url = f"{self.base_url}/public/v1/onetouch/deposits/exportApi"
+        headers = {
+            'Merchants-Backend-Api-Key': self.api_key,
+            'Content-Type': 'application/json'
+        }
+        params = {
+            'createdFrom': created_from,
+            'createdTo': created_to,
+            'page': page,
+            'size': size
+        }
+        if status: params['status'] = status
+        if country: params['country'] = country
+        
+        response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self._decode_page(response.content, 'data')
+    
+    def fetch_payments(self, start_date: str, end_date: str, 
+                      status: Optional[str] = None, 
+                      country: Optional[str] = None) -> List[Dict[str, Any]]:
+        created_from = self._format_datetime(start_date)
+        created_to = self._format_datetime(end_date)
+        
+        all_payments = []
+        page = 1
+        
+        while True:
+            data = self._fetch_page(created_from, created_to, page, status=status, country=country, size = 2000)
+            payments = data.get('data')
+            all_payments.extend(self._in_window(payments, start_date, end_date))
+            if len(payments) < 2000:
+                break
+                
+            page += 1
+        
+        return all_payments
@@ -0,0 +1,90 @@
+import asyncio
+from abc import ABC
+from dataclasses import astuple
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from dateutil import parser
+from config import PSP_FIELD_MAPPINGS, PROJECT_PSP_PAGES, REQUEST_TIMEOUT
+from providers import decode
+
+class PSPBase(ABC):
+    """Base class for PSP integrations."""
+    PSP_NAME: str = ''  # Must be set by subclass
+    EXTRA_FIELDS: Tuple[str, ...] = ()  # raw fields the client reads besides the mapped ones
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.api_key = config.get('api_key')
+        self.base_url = config.get('base_url', '')
+        self.timeout = config.get('timeout', REQUEST_TIMEOUT)
+        self.mapping = PSP_FIELD_MAPPINGS.get(self.PSP_NAME)
+        mapped = [f for f in astuple(self.mapping) if f] if self.mapping else []
+        self.projection_fields = tuple(dict.fromkeys([*mapped, *self.EXTRA_FIELDS]))
+    
+    def _decode(self, response) -> Any:
+        """Decode a JSON response body."""
+        return decode.loads(response.content)
+    
+    def _decode_page(self, content: bytes, records_key: Optional[str]) -> Any:
+        """Decode a page of records (under records_key, or the top-level array if None) keeping only the fields this client needs."""
+        if not PROJECT_PSP_PAGES or not self.projection_fields:
+            return decode.loads(content)
+        return decode.loads_projected(content, records_key, self.projection_fields)
+    
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Fetch raw payments between two naive UTC ISO timestamps."""
+        raise NotImplementedError(f"{self.PSP_NAME} must implement fetch_payments or fetch_payments_async")
+    
+    async def fetch_payments_async(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Async entry point; blocking clients run on the default executor, native async clients override."""
+        return await asyncio.to_thread(self.fetch_payments, start_date, end_date)
+    
+    def _get_field(self, payment: Dict[str, Any], field_name: str) -> Any:
+        """Get field value or None."""
+        return payment.get(field_name)
+    
+    def _to_utc(self, value: Any) -> Optional[datetime]:
+        """Parse a PSP timestamp to an aware UTC datetime; naive values are taken as UTC."""
+        if value is None or value != value:  # None or NaN
+            return None
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc)
+        if not isinstance(value, datetime):
+            try:
+                value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            except ValueError:
+                value = parser.parse(str(value))
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    
+    def _in_window(self, payments: List[Dict[str, Any]], start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Normalize the mapped created_date to UTC in place and keep payments inside [start_date, end_date]."""
+        field = self.mapping.created_date
+        start, end = self._to_utc(start_date), self._to_utc(end_date)
+        kept = []
+        for payment in payments:
+            created = self._to_utc(payment.get(field))
+            if created is not None and start <= created <= end:
+                payment[field] = created
+                kept.append(payment)
+        return kept
+    
+    def standardize_payment(self, payment: Dict[str, Any]) -> Dict[str, Any]:
+        """Standardize payment using PSP-specific mapping."""
+        if not self.mapping:
+            raise ValueError(f"No field mapping defined for {self.PSP_NAME}")
+        
+        return {
+            'psp': self.PSP_NAME,
+            'order_id': self._get_field(payment, self.mapping.order_id),
+            'created_date': self._get_field(payment, self.mapping.created_date),
+            'amount': self._get_field(payment, self.mapping.amount),
+            'currency': self._get_field(payment, self.mapping.currency),
+            'status': self._get_field(payment, self.mapping.status),
+            'transaction_id': self._get_field(payment, self.mapping.transaction_id),
+            'payment_reference': self._get_field(payment, self.mapping.payment_reference)
+        }
+    
+    def standardize_payments(self, payments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Standardize a batch of raw payments."""
+        return [self.standardize_payment(p) for p in payments]
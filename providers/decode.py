@@ -0,0 +1,111 @@
+"""JSON decode backends for PSP API pages.
+
+auto: orjson when it is installed, otherwise the stdlib json module.
+orjson/json: the page is decoded in full and then projected; orjson uses less CPU.
+stream: the records array is decoded one record at a time with the stdlib scanner and each
+record is projected before the next is decoded, so the full page of dicts never exists at once.
+Lowest peak memory, but more CPU than a plain json.loads.
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import JSON_BACKEND
+
+def _load_backend(name: str):
+    if name in ('auto', 'orjson'):
+        try:
+            import orjson
+            return 'orjson', orjson.loads
+        except ImportError:
+            if name == 'orjson':
+                raise
+    if name == 'stream':
+        return 'stream', json.loads
+    return 'json', json.loads
+
+BACKEND, _loads = _load_backend(JSON_BACKEND)
+
+_decoder = json.JSONDecoder()
+_WS = re.compile(r'[ \t\n\r]*')
+
+def loads(content: bytes) -> Any:
+    """Decode a whole JSON response body."""
+    return _loads(content)
+
+def project(records: Iterable[Dict[str, Any]], fields: Iterable[str]) -> List[Dict[str, Any]]:
+    """Keep only the given keys of each record so the rest of the page can be freed."""
+    fields = tuple(fields)
+    return [{k: r[k] for k in fields if k in r} for r in records]
+
+def loads_projected(content: bytes, records_key: Optional[str], fields: Iterable[str]) -> Any:
+    """Decode a page keeping only `fields` of each record.
+
+    Records are the top-level array when records_key is None, otherwise the array under
+    records_key in the top-level object; other top-level values are decoded as usual.
+    """
+    fields = tuple(fields)
+    if BACKEND == 'stream':
+        return stream_projected(content, records_key, fields)
+    doc = _loads(content)
+    if records_key is None:
+        return project(doc, fields)
+    if isinstance(doc.get(records_key), list):
+        doc[records_key] = project(doc[records_key], fields)
+    return doc
+
+def stream_projected(content: bytes, records_key: Optional[str], fields: Tuple[str, ...]) -> Any:
+    """Stdlib decode of a page one record at a time, projecting each record as it is decoded."""
+    text = content.decode('utf-8') if isinstance(content, bytes) else content
+    try:
+        pos = _WS.match(text, 0).end()
+        if records_key is None:
+            doc, pos = _projected_array(text, pos, fields)
+        else:
+            doc, pos = _object(text, pos, records_key, fields)
+    except IndexError:
+        raise json.JSONDecodeError("Unexpected end of data", text, len(text)) from None
+    if _WS.match(text, pos).end() != len(text):
+        raise json.JSONDecodeError("Extra data", text, pos)
+    return doc
+
+def _object(text: str, pos: int, records_key: str, fields: Tuple[str, ...]) -> Tuple[Any, int]:
+    if text[pos] != '{':
+        doc, pos = _decoder.raw_decode(text, pos)
+        return doc, pos
+    doc = {}
+    pos = _WS.match(text, pos + 1).end()
+    if text[pos] == '}':
+        return doc, pos + 1
+    while True:
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _WS.match(text, pos).end()
+        if text[pos] != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = _WS.match(text, pos + 1).end()
+        if key == records_key and text[pos] == '[':
+            doc[key], pos = _projected_array(text, pos, fields)
+        else:
+            doc[key], pos = _decoder.raw_decode(text, pos)
+        pos = _WS.match(text, pos).end()
+        if text[pos] == '}':
+            return doc, pos + 1
+        if text[pos] != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _WS.match(text, pos + 1).end()
+
+def _projected_array(text: str, pos: int, fields: Tuple[str, ...]) -> Tuple[List[Any], int]:
+    if text[pos] != '[':
+        raise json.JSONDecodeError("Expecting '['", text, pos)
+    records = []
+    pos = _WS.match(text, pos + 1).end()
+    if text[pos] == ']':
+        return records, pos + 1
+    while True:
+        record, pos = _decoder.raw_decode(text, pos)
+        records.append({k: record[k] for k in fields if k in record} if isinstance(record, dict) else record)
+        pos = _WS.match(text, pos).end()
+        if text[pos] == ']':
+            return records, pos + 1
+        if text[pos] != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _WS.match(text, pos + 1).end()
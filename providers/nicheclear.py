@@ -0,0 +1,52 @@
+import requests
+from typing import Dict, List, Any
+from providers.base import PSPBase
+
+class NicheclearPSP(PSPBase):
+    PSP_NAME = 'nicheclear'
+    EXTRA_FIELDS = ('paymentType',)
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.base_url = "https://app.nicheclear.com/api"  # Adjust based on your API docs
+    
+    def _fetch_page(self, start_date: str, end_date: str, offset: int = 1) -> Dict[str, Any]:
+        """Fetch Nicheclear transactions."""
+        url = f"{self.base_url}/v1/payments"  # or /payments
+        
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        params = {
+            'created.gte': start_date,
+            'created.lt': end_date,
+            'offset': offset,
+            'limit': 1000  # Adjust based on API
+        }
+        
+        response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self._decode_page(response.content, "result")
+    
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Fetch all Nicheclear payments with pagination."""
+        all_payments = []
+        offset = 0
+        
+        while True:
+            data = self._fetch_page(start_date, end_date, offset)
+            
+            # Handle different response structures
+            payments = data["result"]
+            payments = [payment for payment in payments if payment["paymentType"] == "DEPOSIT"]
+            all_payments.extend(self._in_window(payments, start_date, end_date))
+            
+            # Check pagination
+            if data["hasMore"] == False:
+                break
+                
+            offset += 1000
+        
+        return all_payments
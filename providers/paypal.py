@@ -0,0 +1,91 @@
+import requests
+from typing import Dict, List, Any
+import pandas as pd
+from providers.base import PSPBase
+
+class PayPalPSP(PSPBase):
+    PSP_NAME = 'paypal'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.base_url = "https://api-m.paypal.com"  # sandbox, change to api-m.paypal.com for live
+        self.client_id = config.get('client_id')
+        self.client_secret = config.get('client_secret')
+        self.access_token = None
+    
+    def _get_access_token(self) -> str:
+        """Get PayPal OAuth2 access token."""
+        if self.access_token:
+            return self.access_token
+        
+        url = f"{self.base_url}/v1/oauth2/token"
+        data = {
+            'grant_type': 'client_credentials'
+        }
+        auth = (self.client_id, self.client_secret)
+        
+        response = requests.post(url, auth=auth, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        
+        token_data = response.json()
+        self.access_token = token_data['access_token']
+        return self.access_token
+    
+    def _fetch_transactions(self, start_date: str, end_date: str, page_size: int = 500, page: int = 1) -> Dict[str, Any]:
+        """Fetch PayPal transactions."""
+        token = self._get_access_token()
+        
+        url = f"{self.base_url}/v1/reporting/transactions"
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'json',
+            'Accept': 'application/json'
+        }
+        params = {
+            'start_date': pd.to_datetime(start_date,utc=True).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'end_date': pd.to_datetime(end_date,utc=True).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'page': page,
+            'page_size': page_size,
+        }
+        
+        response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self._decode(response)
+    
+    def _process_paypal_response(self, raw_transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flatten PayPal nested response to standard format."""
+        payments = []
+        
+        for txn in raw_transactions:
+            txn_info = txn['transaction_info']
+            
+            payments.append({
+                'transaction_id': txn_info['transaction_id'],
+                'paypal_reference_id': txn_info['paypal_reference_id'],
+                'transaction_initiation_date': txn_info['transaction_initiation_date'],
+                'transaction_status': txn_info['transaction_status'],
+                'order_id': txn_info['invoice_id'],
+                # Extract nested amounts
+                'amount': txn_info['transaction_amount']['value'],
+                'currency': txn_info['transaction_amount']['currency_code'],
+                # Fees (negative values)
+                'fee_amount': -float(txn_info['fee_amount']['value']) if txn_info.get('fee_amount') else 0
+            })
+        
+        return payments
+    
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Fetch all PayPal payments."""
+        all_payments = []
+        page_size = 500
+        page = 1
+        while True:
+            data = self._fetch_transactions(start_date, end_date, page_size, page)
+            if not data.get("transaction_details"):
+                break
+            payments = self._process_paypal_response(data['transaction_details'])
+            all_payments.extend(self._in_window(payments, start_date, end_date))
+            if page == data["total_pages"]:
+                break
+            page += 1
+        return all_payments
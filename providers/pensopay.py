@@ -0,0 +1,52 @@
+import requests
+from typing import Dict, List, Any
+from providers.base import PSPBase
+
+class PensoPayPSP(PSPBase):
+    PSP_NAME = 'pensopay'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.base_url = "https://api.pensopay.com/v2"
+    
+    def _fetch_transactions(self, start_date: str, end_date: str, page: int) -> Dict[str, Any]:
+        """Fetch PensoPay transactions."""
+        url = f"{self.base_url}/payments"
+        
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',  # Base64 encoded merchant:api_key
+            'Content-Type': 'application/json'
+        }
+        
+        params = {
+            'date_from': start_date + 'Z',
+            'date_to': end_date + 'Z',
+            'page': page,
+            'per_page': 250
+        }
+
+        response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self._decode_page(response.content, "data")
+    
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Fetch all PensoPay payments with pagination."""
+        all_payments = []
+        page = 1
+        
+        while True:
+            
+            data = self._fetch_transactions(start_date, end_date, page)
+            payments = data["data"]
+            all_payments.extend(self._in_window(payments, start_date, end_date))
+            
+            # Check pagination
+            if data["meta"]["current_page"] == data["meta"]["last_page"]:
+                break
+                
+            page += 1
+
+        for payment in all_payments:
+            payment["amount"] /= 100
+
+        return all_payments
@@ -0,0 +1,58 @@
+import requests
+from typing import Dict, List, Any
+from config import NO_DECIMAL_CURRENCIES
+from providers.base import PSPBase
+
+class RevolutPSP(PSPBase):
+    PSP_NAME = 'revolut'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.base_url = "https://merchant.revolut.com/api"
+    
+    def _fetch_orders(self, start_date: str, end_date: str, page_cursor: str = None, page_size: int = 1000, created_before: str = None) -> Dict[str, Any]:
+        """Fetch Revolut orders."""
+        url = f"{self.base_url}/1.0/orders"
+        
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'Revolut-Api-Version': '2025-12-04'
+        }
+        
+        params = {
+            'from_created_date': start_date + 'Z',
+            'to_created_date': end_date + 'Z',
+            'limit': page_size,
+            'created_before': created_before
+        }
+        
+        response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self._decode_page(response.content, None)
+    
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Fetch all Revolut payments with cursor pagination."""
+        all_payments = []
+        page_size = 1000
+        created_before = None
+        
+        while True:
+            data = self._fetch_orders(start_date, end_date, page_size=page_size, created_before = created_before)
+            if not data:
+                break
+            page_len = len(data)
+            created_before = data[-1]["created_at"]
+            data = self._in_window(data, start_date, end_date)
+            data =[
+                {**p, 
+                 "order_currency": p["order_amount"]["currency"],
+                 "order_amount": p["order_amount"]["value"] / 100 if p["order_amount"]["currency"].lower() not in NO_DECIMAL_CURRENCIES else p["order_amount"]["value"], 
+                 } 
+                 for p in data
+                ]
+            all_payments.extend(data)
+            if page_len < page_size:
+                break
+
+        return all_payments
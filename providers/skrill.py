@@ -0,0 +1,51 @@
+import requests
+from datetime import datetime
+from io import StringIO
+from typing import Dict, List, Any
+import pandas as pd
+from providers.base import PSPBase
+
+class SkrillPSP(PSPBase):
+    PSP_NAME = 'skrill'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.email = config.get('email')
+        self.api_key = config.get('api_key')  #
+        self.base_url = "https://www.skrill.com/app/query.pl"
+    
+    def _format_date(self, date_str: str) -> str:
+        """Convert YYYY-MM-DD to DD-MM-YYYY for Skrill MQI."""
+        dt = datetime.fromisoformat(date_str)
+        return dt.strftime('%d-%m-%Y')
+    
+    def _fetch_history(self, start_date: str, end_date: str) -> str:
+        """Fetch Skrill transaction history via MQI."""
+        start_formatted = self._format_date(date_str=start_date)
+        end_formatted = self._format_date(date_str = end_date)
+        
+        params = {
+            'email': self.email,
+            'password': self.api_key,
+            'action': 'history',
+            'start_date': start_formatted,
+            'end_date': end_formatted
+        }
+        
+        response = requests.get(self.base_url, params=params, timeout=300)
+        response.raise_for_status()
+        return response.text
+    
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Fetch all Skrill payments via MQI."""
+        csv_content = self._fetch_history(start_date, end_date)
+        df = pd.read_csv(StringIO(csv_content))
+        df["Time (UTC)"] = (
+            pd.to_datetime(df["Time (CET)"], format='%d %b %y %H:%M')
+            .dt.tz_localize('CET')
+            .dt.tz_convert('UTC')
+        )
+        # MQI only filters by whole days, so trim to the requested window here
+        in_window = df["Time (UTC)"].between(self._to_utc(start_date), self._to_utc(end_date))
+        df = df[in_window & (df.Type == "Receive Money") & (~df['Amount Sent'].isna())]
+        return df.to_dict('records')
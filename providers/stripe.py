@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Any
+from config import NO_DECIMAL_CURRENCIES
+from providers.base import PSPBase
+
+class StripePSP(PSPBase):
+    PSP_NAME = 'stripe'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        import stripe
+        self.stripe = stripe
+        self.stripe.api_key = self.api_key
+        self.stripe.default_http_client = self.stripe.RequestsClient(timeout=self.timeout)
+
+    def fetch_payments(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        start_ts = int(self._to_utc(start_date).timestamp())
+        end_ts = int(self._to_utc(end_date).timestamp())
+        
+        payments = []
+        for pi in self.stripe.PaymentIntent.list(
+            created={'gte': start_ts, 'lte': end_ts},
+            limit=1000
+        ).auto_paging_iter():
+            desc = (pi.description or '').removeprefix("Order #")
+            amt = pi.amount / 100 if pi.currency.lower() not in NO_DECIMAL_CURRENCIES else pi.amount
+            payments.append({
+                'id': pi.id,
+                'created': datetime.fromtimestamp(pi.created, timezone.utc),
+                'amount': amt,
+                'currency': pi.currency,
+                'status': pi.status,
+                'description': desc
+            })
+        return payments
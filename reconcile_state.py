@@ -0,0 +1,38 @@
+import pandas as pd
+from redis_client import get_redis
+
+r = get_redis()
+
+KEY_PREFIX = "psp_recon"
+STATE_TTL = 2 * 86400  # 2 days, well past HOURS_BACK_SEARCH
+MATCHED, MISMATCHED, PENDING = "matched", "mismatched", "pending"
+# PSP fields and the joined DB order fields; a change on either side re-checks the payment
+FINGERPRINT_COLUMNS = ["amount", "status", "order_total", "order_currency"]
+
+def _keys(payments: pd.DataFrame) -> list:
+    return (KEY_PREFIX + ":" + payments["psp"].astype(str) + ":" + payments["transaction_id"].astype(str)).tolist()
+
+def payment_fingerprints(payments: pd.DataFrame) -> pd.Series:
+    """Stable hash of the fields whose change should trigger a re-check."""
+    return pd.util.hash_pandas_object(
+        payments[FINGERPRINT_COLUMNS].astype(str), index=False
+    ).astype(str)
+
+def load_settled(payments: pd.DataFrame) -> pd.Series:
+    """Boolean mask of payments already matched in a previous run with unchanged fingerprint fields."""
+    if payments.empty:
+        return pd.Series(False, index=payments.index)
+    stored = pd.Series(r.mget(_keys(payments)), index=payments.index)
+    expected = MATCHED + "|" + payment_fingerprints(payments).values
+    return (stored == expected) & payments["transaction_id"].notna()
+
+def save_states(payments: pd.DataFrame, states: pd.Series):
+    """Record matched / mismatched / pending per transaction_id with its fingerprint."""
+    payments = payments[payments["transaction_id"].notna()]
+    if payments.empty:
+        return
+    values = states.loc[payments.index] + "|" + payment_fingerprints(payments).values
+    pipe = r.pipeline(transaction=False)
+    for key, value in zip(_keys(payments), values):
+        pipe.set(key, value, ex=STATE_TTL)
+    pipe.execute()
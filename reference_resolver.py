@@ -0,0 +1,45 @@
+import re
+from typing import Iterable, Optional
+import pandas as pd
+
+# Prefixes customers glue onto the order id, e.g. "Swapped04c59c51-..."
+REFERENCE_PREFIXES = ("swapped",)
+
+# A token is letters/digits, optionally joined by single dashes or underscores (as in a uuid);
+# whitespace and any other punctuation end it, so a match can never span two words
+_TOKEN = re.compile(r'[0-9a-z]+(?:[-_][0-9a-z]+)*')
+_SEPARATORS = re.compile(r'[-_]')
+
+def normalize(text: str) -> str:
+    """Lowercase and drop dashes and underscores, so case and id formatting don't matter."""
+    return _SEPARATORS.sub('', str(text).lower())
+
+def tokens(text: str) -> list:
+    """Normalized tokens of a free-text reference."""
+    return [normalize(t) for t in _TOKEN.findall(str(text).lower())]
+
+class ReferenceIndex:
+    """Hash index of normalized order ids for finding known ids inside free-text payment references."""
+
+    def __init__(self, order_ids: Iterable[str]):
+        self._ids = {}
+        for order_id in order_ids:
+            key = normalize(order_id)
+            if _TOKEN.fullmatch(key):
+                self._ids[key] = order_id
+
+    def resolve(self, text: str) -> Optional[str]:
+        """Return the first known order id that makes up a whole token of text."""
+        for token in tokens(text):
+            order_id = self._ids.get(token)
+            if order_id is None:
+                for prefix in REFERENCE_PREFIXES:
+                    if token.startswith(prefix):
+                        order_id = self._ids.get(token[len(prefix):])
+                        break
+            if order_id is not None:
+                return order_id
+        return None
+
+    def resolve_all(self, texts: pd.Series) -> pd.Series:
+        return texts.map(lambda t: self.resolve(t) if isinstance(t, str) else None)
@@ -0,0 +1,48 @@
+import json
+import pytest
+from providers.decode import project, stream_projected
+
+FIELDS = ("id", "amount", "meta")
+
+PAGES = [
+    (None, b'[{"id": 1, "amount": 2.5, "skip": "x"}, {"id": 2, "meta": {"a": [1, 2]}}]'),
+    (None, b' [ ] '),
+    ("data", b'{"total": 2, "data": [{"id": "\\u00e9", "amount": null, "skip": [1]}, 7], "next": null}'),
+    ("data", b'{"data": [], "page": {"size": 0}}'),
+    ("data", b'{"data": {"id": 1}, "other": [{"id": 2, "skip": 3}]}'),
+    ("result", b'{}'),
+    ("result", b'[{"id": 1}]'),
+]
+
+def expected(content, records_key):
+    doc = json.loads(content)
+    if records_key is None:
+        return project(doc, FIELDS)
+    if isinstance(doc, dict) and isinstance(doc.get(records_key), list):
+        doc[records_key] = [project([r], FIELDS)[0] if isinstance(r, dict) else r for r in doc[records_key]]
+    return doc
+
+@pytest.mark.parametrize("records_key, content", PAGES)
+def test_matches_json_loads_then_projection(records_key, content):
+    assert stream_projected(content, records_key, FIELDS) == expected(content, records_key)
+
+@pytest.mark.parametrize("records_key, content", [
+    (None, b'[{"id": 1}, {"id": 2'),
+    (None, b'[{"id": 1},'),
+    ("data", b'{"data": [{"id": 1}]'),
+    ("data", b'{"data": [{"id": 1}], "next":'),
+    ("data", b''),
+])
+def test_truncated_input_raises(records_key, content):
+    with pytest.raises(json.JSONDecodeError):
+        stream_projected(content, records_key, FIELDS)
+
+@pytest.mark.parametrize("records_key, content", [
+    (None, b'[{"id": 1}] [{"id": 2}]'),
+    ("data", b'{"data": []} x'),
+    ("data", b'{"data": [{"id": 1}] "next": 1}'),
+    (None, b'[{"id": 1} {"id": 2}]'),
+])
+def test_extra_data_raises(records_key, content):
+    with pytest.raises(json.JSONDecodeError):
+        stream_projected(content, records_key, FIELDS)
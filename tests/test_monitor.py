@@ -0,0 +1,72 @@
+import pandas as pd
+from monitor import diff_deltas, drop_settled
+
+NOW = pd.Timestamp("2026-10-19 12:00", tz="UTC")
+
+def payments(*rows):
+    return pd.DataFrame(rows, columns=["psp", "order_id", "transaction_id", "payment_reference", "amount", "status"])
+
+def orders(*rows):
+    return pd.DataFrame(rows, columns=["order_id", "order_total", "order_currency", "payment_reference", "created_at"])
+
+def test_second_payment_on_settled_order_is_still_diffed():
+    df_payments = payments(
+        ("stripe", "order-1", "pi_1", None, 10.0, "succeeded"),
+        ("stripe", "order-1", "pi_2", None, 25.0, "succeeded"),
+    )
+    orders_db = orders(("order-1", 10.0, "EUR", None, NOW - pd.Timedelta(hours=1)))
+    settled = pd.Series([True, False], index=df_payments.index)
+
+    df_payments, orders_db = drop_settled(df_payments, orders_db, settled)
+    report = diff_deltas(df_payments, orders_db, now=NOW)
+
+    assert report.mismatches["transaction_id"].tolist() == ["pi_2"]
+    assert report.orphan_payments.empty
+
+def test_drops_order_once_all_its_payments_are_settled():
+    df_payments = payments(
+        ("stripe", "order-1", "pi_1", None, 10.0, "succeeded"),
+        ("stripe", "order-2", "pi_2", None, 20.0, "succeeded"),
+    )
+    orders_db = orders(
+        ("order-1", 10.0, "EUR", None, NOW - pd.Timedelta(hours=1)),
+        ("order-2", 20.0, "EUR", None, NOW - pd.Timedelta(hours=1)),
+    )
+    settled = pd.Series([True, False], index=df_payments.index)
+
+    df_payments, orders_db = drop_settled(df_payments, orders_db, settled)
+
+    assert df_payments["transaction_id"].tolist() == ["pi_2"]
+    assert orders_db["order_id"].tolist() == ["order-2"]
+
+def test_diff_deltas_splits_mismatches_orphans_and_missing():
+    df_payments = payments(
+        ("stripe", "order-mismatch", "pi_1", None, 12.0, "succeeded"),
+        ("stripe", "order-unknown", "pi_2", None, 5.0, "succeeded"),
+    )
+    orders_db = orders(
+        ("order-mismatch", 10.0, "EUR", None, NOW - pd.Timedelta(hours=1)),
+        ("order-missing", 30.0, "EUR", "ref-missing", NOW - pd.Timedelta(hours=1)),
+        ("order-in-flight", 40.0, "EUR", None, NOW - pd.Timedelta(minutes=5)),
+        ("order-lookback", 50.0, "EUR", None, NOW - pd.Timedelta(hours=20)),
+    )
+
+    report = diff_deltas(df_payments, orders_db, grace_minutes=30, now=NOW,
+                         window_start=NOW - pd.Timedelta(hours=2))
+
+    assert report.mismatches["order_id"].tolist() == ["order-mismatch"]
+    assert report.mismatches["delta"].tolist() == [2.0]
+    assert report.orphan_payments["transaction_id"].tolist() == ["pi_2"]
+    assert report.orphan_payments.columns.tolist() == df_payments.columns.tolist()
+    assert report.missing_payments["order_id"].tolist() == ["order-missing"]
+    assert report.missing_payments.columns.tolist() == orders_db.columns.tolist()
+    assert report.missing_payments["payment_reference"].tolist() == ["ref-missing"]
+
+def test_diff_deltas_with_no_payments_reports_orders_as_missing():
+    orders_db = orders(("order-1", 10.0, "EUR", None, NOW - pd.Timedelta(hours=1)))
+
+    report = diff_deltas(payments(), orders_db, now=NOW)
+
+    assert report.mismatches.empty
+    assert report.orphan_payments.empty
+    assert report.missing_payments["order_id"].tolist() == ["order-1"]
@@ -0,0 +1,44 @@
+import pandas as pd
+from reference_resolver import ReferenceIndex
+
+UUID = "04c59c51-6e70-4659-b21c-6b55fce47256"
+
+def test_resolves_id_among_extra_words_and_case():
+    index = ReferenceIndex([UUID])
+    assert index.resolve(f"Swapped {UUID.upper()} thanks!") == UUID
+    assert index.resolve(f"payment for order #{UUID}.") == UUID
+
+def test_resolves_id_without_dashes_or_glued_to_prefix():
+    index = ReferenceIndex([UUID])
+    assert index.resolve("swapped " + UUID.replace("-", "")) == UUID
+    assert index.resolve("Swapped" + UUID) == UUID
+
+def test_does_not_join_words_into_a_longer_id():
+    index = ReferenceIndex(["123456", "1234567"])
+    assert index.resolve("Swapped 123456 7") == "123456"
+    assert index.resolve("Swapped 1234567") == "1234567"
+
+def test_does_not_match_across_word_boundaries():
+    index = ReferenceIndex(["123456"])
+    assert index.resolve("Swapped 12345 6") is None
+    assert index.resolve("Swapped 1234 56") is None
+
+def test_does_not_match_inside_longer_numbers():
+    index = ReferenceIndex(["123456", "202612"])
+    assert index.resolve("call +45 71234567") is None
+    assert index.resolve("IBAN DK5000401234567890") is None
+    assert index.resolve("invoice 20261231") is None
+    assert index.resolve("ref 123456-7") is None
+
+def test_resolves_short_ids_only_as_whole_tokens():
+    index = ReferenceIndex(["12345"])
+    assert index.resolve("Swapped 12345") == "12345"
+    assert index.resolve("Swapped12345") == "12345"
+    assert index.resolve("Swapped 123456") is None
+    assert index.resolve("Swapped 1234 5") is None
+
+def test_ignores_non_string_references():
+    index = ReferenceIndex([UUID])
+    resolved = index.resolve_all(pd.Series([f"Swapped {UUID}", None, "nothing here"]))
+    assert resolved[0] == UUID
+    assert resolved[1:].isna().all()